@@ -1,14 +1,31 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
+import itertools
+import secrets
+from dataclasses import dataclass
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
-app = FastAPI(title="Demo Site", version="0.1.0")
+app = FastAPI(
+    title="Demo Site",
+    version="0.1.0",
+    default_response_class=ORJSONResponse,
+)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-_todos: dict[int, dict[str, object]] = {}
-_next_id = 1
+_todos: dict[int, "TodoRow"] = {}
+# count.__next__ is atomic under the GIL, so threadpool-run handlers can't
+# hand out duplicate ids the way a `global` read-modify-write could.
+_next_id = itertools.count(1).__next__
+
+# Bumped on every write to _todos; GET /todos derives its ETag from it. The
+# per-process salt keeps an ETag from a previous run from matching after restart.
+# Held in a one-element list so writers update it without a `global` statement.
+_TODOS_ETAG_SALT = secrets.token_hex(4)
+_next_todos_version = itertools.count(1).__next__
+_todos_version = [0]
 
 
 class TodoCreate(BaseModel):
@@ -26,6 +43,39 @@ class Todo(BaseModel):
     done: bool
 
 
+@dataclass(slots=True)
+class TodoRow:
+    # Storage-side row; much lighter than a dict or model per todo.
+    id: int
+    title: str
+    done: bool
+
+
+# Serializes GET /todos while list[Todo] documents it, so TodoRow and Todo
+# must stay field-identical (test_list_todos_matches_schema checks this).
+_TODO_LIST_ADAPTER = TypeAdapter(list[TodoRow])
+
+# Icon URLs are fixed and unhashed, so a bounded max-age lets replaced icons
+# reach clients within a day instead of being pinned for good.
+_ICON_HEADERS = {"Cache-Control": "public, max-age=86400"}
+
+
+def _touch_todos() -> None:
+    _todos_version[0] = _next_todos_version()
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored (RFC 9110).
+    if if_none_match is None:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
 @app.get("/", include_in_schema=False)
 def index() -> FileResponse:
     return FileResponse("static/index.html")
@@ -34,53 +84,65 @@ def index() -> FileResponse:
 @app.get("/favicon.ico", include_in_schema=False)
 def favicon() -> FileResponse:
     # Avoid noisy 404s in terminal from browsers automatically requesting this.
-    return FileResponse("static/favicon.ico")
+    return FileResponse("static/favicon.ico", headers=_ICON_HEADERS)
 
 
 @app.get("/apple-touch-icon.png", include_in_schema=False)
 def apple_touch_icon() -> FileResponse:
     # Avoid noisy 404s on iOS/Safari.
-    return FileResponse("static/apple-touch-icon.png")
+    return FileResponse("static/apple-touch-icon.png", headers=_ICON_HEADERS)
 
 
 @app.get("/apple-touch-icon-precomposed.png", include_in_schema=False)
 def apple_touch_icon_precomposed() -> FileResponse:
     # Avoid noisy 404s on iOS/Safari.
-    return FileResponse("static/apple-touch-icon-precomposed.png")
+    return FileResponse(
+        "static/apple-touch-icon-precomposed.png", headers=_ICON_HEADERS
+    )
 
 
 @app.get("/todos", response_model=list[Todo])
-def list_todos() -> list[Todo]:
-    return [Todo(**t) for t in _todos.values()]  # type: ignore[arg-type]
+def list_todos(request: Request) -> Response:
+    etag = f'W/"{_TODOS_ETAG_SALT}-{_todos_version[0]}"'
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    # Serialize straight to JSON bytes; response_model is kept for the schema.
+    body = _TODO_LIST_ADAPTER.dump_json(list(_todos.values()))
+    return Response(body, media_type="application/json", headers={"ETag": etag})
 
 
 @app.post("/todos", response_model=Todo, status_code=201)
-def create_todo(payload: TodoCreate) -> Todo:
-    global _next_id
-    todo = Todo(id=_next_id, title=payload.title, done=payload.done)
-    _todos[_next_id] = todo.model_dump()
-    _next_id += 1
+def create_todo(payload: TodoCreate) -> TodoRow:
+    todo = TodoRow(id=_next_id(), title=payload.title, done=payload.done)
+    _todos[todo.id] = todo
+    _touch_todos()
     return todo
 
 
 @app.get("/todos/{todo_id}", response_model=Todo)
-def get_todo(todo_id: int) -> Todo:
-    if todo_id not in _todos:
-        raise HTTPException(status_code=404, detail="Not found")
-    return Todo(**_todos[todo_id])  # type: ignore[arg-type]
+def get_todo(todo_id: int) -> TodoRow:
+    try:
+        return _todos[todo_id]
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Not found") from None
 
 
 @app.patch("/todos/{todo_id}", response_model=Todo)
-def update_todo(todo_id: int, payload: TodoUpdate) -> Todo:
-    if todo_id not in _todos:
-        raise HTTPException(status_code=404, detail="Not found")
-    _todos[todo_id]["done"] = payload.done
-    return Todo(**_todos[todo_id])  # type: ignore[arg-type]
+def update_todo(todo_id: int, payload: TodoUpdate) -> TodoRow:
+    try:
+        todo = _todos[todo_id]
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Not found") from None
+    todo.done = payload.done
+    _touch_todos()
+    return todo
 
 
 @app.delete("/todos/{todo_id}", status_code=204)
 def delete_todo(todo_id: int) -> None:
-    if todo_id not in _todos:
-        raise HTTPException(status_code=404, detail="Not found")
-    del _todos[todo_id]
+    try:
+        del _todos[todo_id]
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Not found") from None
+    _touch_todos()
     return None
@@ -1,5 +1,8 @@
+import pytest
 from fastapi.testclient import TestClient
-from app.main import app
+from pydantic import TypeAdapter
+
+from app.main import Todo, app
 
 client = TestClient(app)
 
@@ -24,6 +27,14 @@ def test_list_todos() -> None:
     assert isinstance(r.json(), list)
 
 
+def test_list_todos_matches_schema() -> None:
+    client.post("/todos", json={"title": "Schema check"})
+    r = client.get("/todos")
+    adapter = TypeAdapter(list[Todo])
+    todos = adapter.validate_json(r.content)
+    assert adapter.dump_python(todos, mode="json") == r.json()
+
+
 def test_get_missing_todo() -> None:
     r = client.get("/todos/99999")
     assert r.status_code == 404
@@ -44,3 +55,68 @@ def test_delete_todo_success() -> None:
 def test_delete_missing_todo() -> None:
     d = client.delete("/todos/99999")
     assert d.status_code == 404
+
+
+def test_update_todo() -> None:
+    r = client.post("/todos", json={"title": "Walk dog"})
+    todo_id = r.json()["id"]
+
+    u = client.patch(f"/todos/{todo_id}", json={"done": True})
+    assert u.status_code == 200
+    assert u.json() == {"id": todo_id, "title": "Walk dog", "done": True}
+
+    r2 = client.get(f"/todos/{todo_id}")
+    assert r2.json()["done"] is True
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["/favicon.ico", "/apple-touch-icon.png", "/apple-touch-icon-precomposed.png"],
+)
+def test_icon_is_cacheable(path: str) -> None:
+    r = client.get(path)
+    assert r.status_code == 200
+    assert r.headers["cache-control"] == "public, max-age=86400"
+
+
+def test_trailing_slash_redirects() -> None:
+    r = client.get("/todos/", follow_redirects=False)
+    assert r.status_code == 307
+    assert r.headers["location"].endswith("/todos")
+
+
+def test_bad_method_returns_405() -> None:
+    r = client.put("/todos/1", json={"done": True})
+    assert r.status_code == 405
+    assert "allow" in r.headers
+
+
+def test_list_todos_etag() -> None:
+    r = client.get("/todos")
+    etag = r.headers["etag"]
+
+    r2 = client.get("/todos", headers={"If-None-Match": etag})
+    assert r2.status_code == 304
+    assert r2.content == b""
+
+    client.post("/todos", json={"title": "Changes the list"})
+    r3 = client.get("/todos", headers={"If-None-Match": etag})
+    assert r3.status_code == 200
+    assert r3.headers["etag"] != etag
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    ['W/"stale", {etag}', '{etag} , W/"other"', "*", "{strong}"],
+)
+def test_list_todos_etag_header_forms(if_none_match: str) -> None:
+    etag = client.get("/todos").headers["etag"]
+    header = if_none_match.format(etag=etag, strong=etag.removeprefix("W/"))
+
+    r = client.get("/todos", headers={"If-None-Match": header})
+    assert r.status_code == 304
+
+
+def test_update_missing_todo() -> None:
+    r = client.patch("/todos/99999", json={"done": True})
+    assert r.status_code == 404